@@ -4,30 +4,146 @@ Pokemon & TCG Card Drop Monitor
 Monitors Walmart, Target, Best Buy, and GameStop for upcoming card releases
 """
 
-import requests
-from bs4 import BeautifulSoup
+import asyncio
+import aiohttp
+from bs4 import BeautifulSoup, FeatureNotFound, SoupStrainer
+import hashlib
 import json
+import logging
 import sqlite3
 from datetime import datetime, timedelta
-import time
+import threading
 import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 import os
-from typing import List, Dict, Optional
+from typing import Callable, List, Dict, Mapping, Optional, Tuple
 import re
+import signal
+from collections import OrderedDict
+
+# Optional fast paths for Target's JSON-LD: lxml for script extraction, orjson for decoding
+try:
+    import lxml.html
+except ImportError:
+    lxml = None
+
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+log = logging.getLogger(__name__)
+
+# Shared by get_all_drops and get_all_drops_json so both page through drops in the same order
+_SQL_DROPS_PAGE = '''
+    FROM drops
+    WHERE status = ?
+    ORDER BY drop_date ASC, discovered_date DESC
+    LIMIT ? OFFSET ?
+'''
+
+_SQL_DROPS_JSON = '''
+    SELECT json_object(
+               'id', id, 'name', product_name, 'retailer', retailer, 'url', url, 'price', price,
+               'drop_date', drop_date, 'drop_time', drop_time, 'status', status,
+               'discovered_date', discovered_date, 'notified', notified)
+''' + _SQL_DROPS_PAGE
+
+# Set by SIGINT/SIGTERM to end the scan loop without waiting out the interval
+_stop = threading.Event()
+
+# Patterns are compiled once here rather than on every product/page
+_PRICE_RE = re.compile(r'\$?(\d+\.?\d*)')
+_DATE_RES = (
+    re.compile(r'(\d{1,2})/(\d{1,2})/(\d{4})'),  # MM/DD/YYYY
+    re.compile(r'(\w+)\s+(\d{1,2}),?\s+(\d{4})'),  # Month DD, YYYY
+    re.compile(r'(\d{4})-(\d{2})-(\d{2})'),  # YYYY-MM-DD
+)
+_PREORDER_RE = re.compile(
+    r'preorder|pre-order|coming soon|releases|available|street date|launch date|20(?:25|26)',
+    re.IGNORECASE
+)
+_PRICE_CLASS_RE = re.compile('.*price.*')
+_WM_TITLE_RE = re.compile('.*product-title.*')
+_BB_ITEM_RE = re.compile('.*sku-item.*')
+_BB_TITLE_RE = re.compile('.*sku-title.*')
+_BB_PRICE_RE = re.compile('.*priceView.*')
+_BB_LINK_RE = re.compile('.*sku-link.*')
+_GS_TILE_RE = re.compile('.*product-grid-tile.*')
+_GS_NAME_RE = re.compile('.*product-name.*')
+
+# Only build the product-card subtrees of each results page
+_WM_STRAIN = SoupStrainer('div', attrs={'data-item-id': True})
+_BB_STRAIN = SoupStrainer('div', class_=_BB_ITEM_RE)
+_GS_STRAIN = SoupStrainer('div', class_=_GS_TILE_RE)
+
+# Alert email template, filled in with one row per drop
+_EMAIL_HEAD = """
+        <html>
+          <head></head>
+          <body>
+            <h2>Upcoming Card Drops - Next 7 Days!</h2>
+            <p>The following Pokemon/TCG products are releasing soon:</p>
+            <table border="1" cellpadding="10" style="border-collapse: collapse;">
+              <tr style="background-color: #f2f2f2;">
+                <th>Product</th>
+                <th>Retailer</th>
+                <th>Price</th>
+                <th>Drop Date</th>
+                <th>Link</th>
+              </tr>
+        """
+_EMAIL_ROW = """
+              <tr>
+                <td>{name}</td>
+                <td>{retailer}</td>
+                <td>{price}</td>
+                <td>{drop_date}</td>
+                <td><a href="{url}">View Product</a></td>
+              </tr>
+            """
+_EMAIL_TAIL = """
+            </table>
+            <p><strong>Remember:</strong> Set reminders to check these sites at the drop time!</p>
+          </body>
+        </html>
+        """
 
 class CardDropMonitor:
     def __init__(self, db_path='card_drops.db'):
         self.db_path = db_path
         self.init_database()
+        # One long-lived connection shared by the scanner and web threads
+        self.conn = self._connect()
+        self._db_lock = threading.Lock()
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
         }
-        
+        self.max_retries = 3
+        self.retry_backoff = 0.5
+        # Parsed results per search URL, revalidated with ETag/Last-Modified on each scan
+        self._page_cache = OrderedDict()
+        self._page_cache_lock = threading.Lock()
+        self.page_cache_size = 32
+        
+    def _connect(self) -> sqlite3.Connection:
+        """Open a database connection with WAL journaling and tuned pragmas"""
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute('PRAGMA wal_autocheckpoint=1000')
+        conn.execute('PRAGMA busy_timeout=5000')
+        conn.execute('PRAGMA temp_store=MEMORY')
+        conn.execute('PRAGMA mmap_size=268435456')
+        conn.execute('PRAGMA cache_size=-20000')
+        conn.row_factory = sqlite3.Row
+        return conn
+    
     def init_database(self):
         """Initialize SQLite database to store drop information"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         
         cursor.execute('''
@@ -57,189 +173,269 @@ class CardDropMonitor:
             )
         ''')
         
+        # Indexes for the status/date listing, the un-notified alert scan and per-retailer stats
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_drops_status_date ON drops(status, drop_date)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_drops_notified ON drops(notified) WHERE notified = 0')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_drops_status_retailer ON drops(status, retailer)')
+        # Refresh planner statistics so the indexes above are chosen over table scans
+        cursor.execute('ANALYZE')
+        
         conn.commit()
         conn.close()
         
-    def search_walmart(self) -> List[Dict]:
-        """Search Walmart for Pokemon and TCG products"""
+    async def _fetch(self, session: aiohttp.ClientSession, semaphore: asyncio.Semaphore, url: str,
+                     request_headers: Optional[Dict] = None) -> Tuple[int, Mapping[str, str], Optional[bytes]]:
+        """Fetch a search page, returning its status, response headers and body (only read on a 200)"""
+        for attempt in range(self.max_retries + 1):
+            try:
+                async with semaphore:
+                    async with session.get(url, headers=request_headers,
+                                           timeout=aiohttp.ClientTimeout(total=10)) as response:
+                        # Copied as a CIMultiDict so ETag/Last-Modified lookups stay case-insensitive
+                        if response.status != 200:
+                            return response.status, response.headers.copy(), None
+                        return response.status, response.headers.copy(), await response.read()
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                if attempt == self.max_retries:
+                    raise
+                # Exponential backoff between retries, released from the semaphore
+                await asyncio.sleep(self.retry_backoff * (2 ** attempt))
+    
+    async def _fetch_results(self, session: aiohttp.ClientSession, semaphore: asyncio.Semaphore, url: str,
+                             parse: Callable[[bytes, str], List[Dict]]) -> List[Dict]:
+        """Fetch and parse a search page, reusing the cached results if the page hasn't changed"""
+        with self._page_cache_lock:
+            cached = self._page_cache.get(url)
+        
+        # Ask the retailer to skip the body if the page is unchanged since the last scan
+        request_headers = {}
+        if cached:
+            if cached['etag']:
+                request_headers['If-None-Match'] = cached['etag']
+            if cached['last_modified']:
+                request_headers['If-Modified-Since'] = cached['last_modified']
+        
+        status, headers, content = await self._fetch(session, semaphore, url, request_headers)
+        
+        if status == 304 and cached:
+            entry = cached
+        elif status != 200:
+            return []
+        else:
+            digest = hashlib.sha1(content).digest()
+            if cached and cached['digest'] == digest:
+                # Same body without validator support; skip the parse
+                results = cached['results']
+            else:
+                results = parse(content, url)
+            entry = {
+                'etag': headers.get('ETag'),
+                'last_modified': headers.get('Last-Modified'),
+                'digest': digest,
+                'results': results
+            }
+        
+        with self._page_cache_lock:
+            self._page_cache[url] = entry
+            self._page_cache.move_to_end(url)
+            while len(self._page_cache) > self.page_cache_size:
+                self._page_cache.popitem(last=False)
+        
+        return list(entry['results'])
+    
+    async def _search_pages(self, session: aiohttp.ClientSession, semaphore: asyncio.Semaphore, urls: List[str],
+                            retailer: str, parse: Callable[[bytes, str], List[Dict]]) -> List[Dict]:
+        """Fetch and parse every search page for a retailer concurrently"""
+        pages = await asyncio.gather(*(self._fetch_results(session, semaphore, url, parse) for url in urls),
+                                     return_exceptions=True)
+        
         results = []
+        for page in pages:
+            if isinstance(page, BaseException):
+                log.error("Error searching %s: %s", retailer, page, exc_info=page)
+            else:
+                results.extend(page)
+        
+        return results
+    
+    def _make_soup(self, content: bytes, parse_only: Optional[SoupStrainer] = None) -> BeautifulSoup:
+        """Parse HTML with lxml, falling back to the pure-Python parser if lxml isn't installed"""
+        try:
+            return BeautifulSoup(content, 'lxml', parse_only=parse_only)
+        except FeatureNotFound:
+            return BeautifulSoup(content, 'html.parser', parse_only=parse_only)
+    
+    async def search_walmart(self, session: aiohttp.ClientSession, semaphore: asyncio.Semaphore) -> List[Dict]:
+        """Search Walmart for Pokemon and TCG products"""
         search_terms = ['pokemon cards', 'pokemon trading card game', 'pokemon tcg']
+        # Walmart's search API endpoint
+        urls = [f"https://www.walmart.com/search?q={term.replace(' ', '+')}" for term in search_terms]
+        return await self._search_pages(session, semaphore, urls, 'Walmart', self._parse_walmart)
+    
+    def _parse_walmart(self, content: bytes, url: str) -> List[Dict]:
+        """Parse a Walmart search results page"""
+        results = []
+        soup = self._make_soup(content, parse_only=_WM_STRAIN)
         
-        for term in search_terms:
+        # Look for product listings (Walmart's structure may vary)
+        # This is a simplified example - actual implementation would need more robust parsing
+        products = soup.find_all('div', {'data-item-id': True})
+        
+        for product in products[:10]:  # Limit to first 10 results
             try:
-                # Walmart's search API endpoint
-                url = f"https://www.walmart.com/search?q={term.replace(' ', '+')}"
-                response = requests.get(url, headers=self.headers, timeout=10)
+                name_elem = product.find('span', class_=_WM_TITLE_RE)
+                price_elem = product.find('div', class_=_PRICE_CLASS_RE)
+                link_elem = product.find('a', href=True)
                 
-                if response.status_code == 200:
-                    soup = BeautifulSoup(response.content, 'html.parser')
-                    
-                    # Look for product listings (Walmart's structure may vary)
-                    # This is a simplified example - actual implementation would need more robust parsing
-                    products = soup.find_all('div', {'data-item-id': True})
+                if name_elem and link_elem:
+                    product_name = name_elem.get_text(strip=True)
+                    # Walk the product subtree once for both keyword and date matching
+                    full_text = product.get_text(separator=' ', strip=True)
+                    price = self.extract_price(price_elem.get_text() if price_elem else '')
+                    url = f"https://www.walmart.com{link_elem['href']}"
                     
-                    for product in products[:10]:  # Limit to first 10 results
-                        try:
-                            name_elem = product.find('span', class_=re.compile('.*product-title.*'))
-                            price_elem = product.find('div', class_=re.compile('.*price.*'))
-                            link_elem = product.find('a', href=True)
-                            
-                            if name_elem and link_elem:
-                                product_name = name_elem.get_text(strip=True)
-                                price = self.extract_price(price_elem.get_text() if price_elem else '')
-                                url = f"https://www.walmart.com{link_elem['href']}"
-                                
-                                # Check if it's a preorder or upcoming release
-                                if self.is_preorder_or_upcoming(product_name, product.get_text()):
-                                    results.append({
-                                        'name': product_name,
-                                        'retailer': 'Walmart',
-                                        'url': url,
-                                        'price': price,
-                                        'drop_date': self.extract_date(product.get_text())
-                                    })
-                        except Exception as e:
-                            continue
-                            
+                    # Check if it's a preorder or upcoming release
+                    if self.is_preorder_or_upcoming(product_name, full_text):
+                        results.append({
+                            'name': product_name,
+                            'retailer': 'Walmart',
+                            'url': url,
+                            'price': price,
+                            'drop_date': self.extract_date(full_text)
+                        })
             except Exception as e:
-                print(f"Error searching Walmart: {e}")
-                
+                continue
+        
         return results
     
-    def search_target(self) -> List[Dict]:
+    async def search_target(self, session: aiohttp.ClientSession, semaphore: asyncio.Semaphore) -> List[Dict]:
         """Search Target for Pokemon and TCG products"""
-        results = []
         search_terms = ['pokemon cards', 'pokemon tcg']
+        urls = [f"https://www.target.com/s?searchTerm={term.replace(' ', '+')}" for term in search_terms]
+        return await self._search_pages(session, semaphore, urls, 'Target', self._parse_target)
+    
+    def _parse_target(self, content: bytes, url: str) -> List[Dict]:
+        """Parse a Target search results page"""
+        results = []
+        
+        # lxml refuses an empty document; an empty page simply has no products
+        if not content.strip():
+            return results
+        
+        # Target uses React, so we'd need to parse their data differently
+        # Look for JSON data in script tags; only their text is needed, so skip the soup when lxml is available
+        if lxml is not None:
+            tree = lxml.html.fromstring(content)
+            scripts = [script.text for script in tree.xpath('//script[@type="application/ld+json"]')]
+        else:
+            soup = self._make_soup(content)
+            scripts = [script.get_text() for script in soup.find_all('script', type='application/ld+json')]
         
-        for term in search_terms:
+        for script in scripts:
             try:
-                url = f"https://www.target.com/s?searchTerm={term.replace(' ', '+')}"
-                response = requests.get(url, headers=self.headers, timeout=10)
-                
-                if response.status_code == 200:
-                    soup = BeautifulSoup(response.content, 'html.parser')
-                    
-                    # Target uses React, so we'd need to parse their data differently
-                    # Look for JSON data in script tags
-                    scripts = soup.find_all('script', type='application/ld+json')
-                    
-                    for script in scripts:
-                        try:
-                            data = json.loads(script.string)
-                            if isinstance(data, dict) and 'name' in data:
-                                product_name = data.get('name', '')
-                                if 'pokemon' in product_name.lower() or 'tcg' in product_name.lower():
-                                    results.append({
-                                        'name': product_name,
-                                        'retailer': 'Target',
-                                        'url': data.get('url', url),
-                                        'price': self.extract_price(str(data.get('offers', {}).get('price', ''))),
-                                        'drop_date': self.extract_date(str(data.get('offers', {}).get('availability', '')))
-                                    })
-                        except:
-                            continue
-                            
-            except Exception as e:
-                print(f"Error searching Target: {e}")
-                
+                data = _json_loads(script)
+                if isinstance(data, dict) and 'name' in data:
+                    product_name = data.get('name', '')
+                    if 'pokemon' in product_name.lower() or 'tcg' in product_name.lower():
+                        results.append({
+                            'name': product_name,
+                            'retailer': 'Target',
+                            'url': data.get('url', url),
+                            'price': self.extract_price(str(data.get('offers', {}).get('price', ''))),
+                            'drop_date': self.extract_date(str(data.get('offers', {}).get('availability', '')))
+                        })
+            except:
+                continue
+        
         return results
     
-    def search_bestbuy(self) -> List[Dict]:
+    async def search_bestbuy(self, session: aiohttp.ClientSession, semaphore: asyncio.Semaphore) -> List[Dict]:
         """Search Best Buy for Pokemon and TCG products"""
-        results = []
         search_terms = ['pokemon cards', 'pokemon tcg']
+        urls = [f"https://www.bestbuy.com/site/searchpage.jsp?st={term.replace(' ', '+')}" for term in search_terms]
+        return await self._search_pages(session, semaphore, urls, 'Best Buy', self._parse_bestbuy)
+    
+    def _parse_bestbuy(self, content: bytes, url: str) -> List[Dict]:
+        """Parse a Best Buy search results page"""
+        results = []
+        soup = self._make_soup(content, parse_only=_BB_STRAIN)
+        
+        # Best Buy product listings
+        products = soup.find_all('div', class_=_BB_ITEM_RE)
         
-        for term in search_terms:
+        for product in products[:10]:
             try:
-                url = f"https://www.bestbuy.com/site/searchpage.jsp?st={term.replace(' ', '+')}"
-                response = requests.get(url, headers=self.headers, timeout=10)
+                name_elem = product.find('h4', class_=_BB_TITLE_RE)
+                price_elem = product.find('div', class_=_BB_PRICE_RE)
+                link_elem = product.find('a', class_=_BB_LINK_RE)
                 
-                if response.status_code == 200:
-                    soup = BeautifulSoup(response.content, 'html.parser')
+                if name_elem and link_elem:
+                    product_name = name_elem.get_text(strip=True)
+                    # Walk the product subtree once for both keyword and date matching
+                    full_text = product.get_text(separator=' ', strip=True)
+                    price = self.extract_price(price_elem.get_text() if price_elem else '')
+                    url = f"https://www.bestbuy.com{link_elem['href']}"
                     
-                    # Best Buy product listings
-                    products = soup.find_all('div', class_=re.compile('.*sku-item.*'))
-                    
-                    for product in products[:10]:
-                        try:
-                            name_elem = product.find('h4', class_=re.compile('.*sku-title.*'))
-                            price_elem = product.find('div', class_=re.compile('.*priceView.*'))
-                            link_elem = product.find('a', class_=re.compile('.*sku-link.*'))
-                            
-                            if name_elem and link_elem:
-                                product_name = name_elem.get_text(strip=True)
-                                price = self.extract_price(price_elem.get_text() if price_elem else '')
-                                url = f"https://www.bestbuy.com{link_elem['href']}"
-                                
-                                if self.is_preorder_or_upcoming(product_name, product.get_text()):
-                                    results.append({
-                                        'name': product_name,
-                                        'retailer': 'Best Buy',
-                                        'url': url,
-                                        'price': price,
-                                        'drop_date': self.extract_date(product.get_text())
-                                    })
-                        except:
-                            continue
-                            
-            except Exception as e:
-                print(f"Error searching Best Buy: {e}")
-                
+                    if self.is_preorder_or_upcoming(product_name, full_text):
+                        results.append({
+                            'name': product_name,
+                            'retailer': 'Best Buy',
+                            'url': url,
+                            'price': price,
+                            'drop_date': self.extract_date(full_text)
+                        })
+            except:
+                continue
+        
         return results
     
-    def search_gamestop(self) -> List[Dict]:
+    async def search_gamestop(self, session: aiohttp.ClientSession, semaphore: asyncio.Semaphore) -> List[Dict]:
         """Search GameStop for Pokemon and TCG products"""
-        results = []
         search_terms = ['pokemon cards', 'pokemon tcg']
+        urls = [f"https://www.gamestop.com/search/?q={term.replace(' ', '+')}" for term in search_terms]
+        return await self._search_pages(session, semaphore, urls, 'GameStop', self._parse_gamestop)
+    
+    def _parse_gamestop(self, content: bytes, url: str) -> List[Dict]:
+        """Parse a GameStop search results page"""
+        results = []
+        soup = self._make_soup(content, parse_only=_GS_STRAIN)
         
-        for term in search_terms:
+        products = soup.find_all('div', class_=_GS_TILE_RE)
+        
+        for product in products[:10]:
             try:
-                url = f"https://www.gamestop.com/search/?q={term.replace(' ', '+')}"
-                response = requests.get(url, headers=self.headers, timeout=10)
+                name_elem = product.find('a', class_=_GS_NAME_RE)
+                price_elem = product.find('span', class_=_PRICE_CLASS_RE)
                 
-                if response.status_code == 200:
-                    soup = BeautifulSoup(response.content, 'html.parser')
-                    
-                    products = soup.find_all('div', class_=re.compile('.*product-grid-tile.*'))
+                if name_elem:
+                    product_name = name_elem.get_text(strip=True)
+                    # Walk the product subtree once for both keyword and date matching
+                    full_text = product.get_text(separator=' ', strip=True)
+                    url = f"https://www.gamestop.com{name_elem['href']}"
+                    price = self.extract_price(price_elem.get_text() if price_elem else '')
                     
-                    for product in products[:10]:
-                        try:
-                            name_elem = product.find('a', class_=re.compile('.*product-name.*'))
-                            price_elem = product.find('span', class_=re.compile('.*price.*'))
-                            
-                            if name_elem:
-                                product_name = name_elem.get_text(strip=True)
-                                url = f"https://www.gamestop.com{name_elem['href']}"
-                                price = self.extract_price(price_elem.get_text() if price_elem else '')
-                                
-                                if self.is_preorder_or_upcoming(product_name, product.get_text()):
-                                    results.append({
-                                        'name': product_name,
-                                        'retailer': 'GameStop',
-                                        'url': url,
-                                        'price': price,
-                                        'drop_date': self.extract_date(product.get_text())
-                                    })
-                        except:
-                            continue
-                            
-            except Exception as e:
-                print(f"Error searching GameStop: {e}")
-                
+                    if self.is_preorder_or_upcoming(product_name, full_text):
+                        results.append({
+                            'name': product_name,
+                            'retailer': 'GameStop',
+                            'url': url,
+                            'price': price,
+                            'drop_date': self.extract_date(full_text)
+                        })
+            except:
+                continue
+        
         return results
     
     def is_preorder_or_upcoming(self, name: str, text: str) -> bool:
         """Check if product is a preorder or upcoming release"""
-        keywords = ['preorder', 'pre-order', 'coming soon', 'releases', 'available', 
-                   'street date', 'launch date', '2025', '2026']
-        text_lower = (name + ' ' + text).lower()
-        return any(keyword in text_lower for keyword in keywords)
+        return bool(_PREORDER_RE.search(name) or _PREORDER_RE.search(text))
     
     def extract_price(self, text: str) -> Optional[float]:
         """Extract price from text"""
         try:
             # Find price pattern like $19.99
-            match = re.search(r'\$?(\d+\.?\d*)', text.replace(',', ''))
+            match = _PRICE_RE.search(text.replace(',', ''))
             if match:
                 return float(match.group(1))
         except:
@@ -250,14 +446,8 @@ class CardDropMonitor:
         """Extract date from text"""
         try:
             # Look for date patterns
-            date_patterns = [
-                r'(\d{1,2})/(\d{1,2})/(\d{4})',  # MM/DD/YYYY
-                r'(\w+)\s+(\d{1,2}),?\s+(\d{4})',  # Month DD, YYYY
-                r'(\d{4})-(\d{2})-(\d{2})',  # YYYY-MM-DD
-            ]
-            
-            for pattern in date_patterns:
-                match = re.search(pattern, text)
+            for pattern in _DATE_RES:
+                match = pattern.search(text)
                 if match:
                     return match.group(0)
                     
@@ -267,109 +457,139 @@ class CardDropMonitor:
     
     def save_drop(self, drop: Dict):
         """Save drop information to database"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        now = datetime.now().isoformat()
         
-        try:
-            cursor.execute('''
-                INSERT OR REPLACE INTO drops 
-                (product_name, retailer, url, price, drop_date, discovered_date, last_checked)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                drop['name'],
-                drop['retailer'],
-                drop['url'],
-                drop.get('price'),
-                drop.get('drop_date'),
-                datetime.now().isoformat(),
-                datetime.now().isoformat()
-            ))
-            conn.commit()
-        except sqlite3.IntegrityError:
-            # Update existing entry
-            cursor.execute('''
-                UPDATE drops 
-                SET price = ?, drop_date = ?, last_checked = ?
-                WHERE product_name = ? AND retailer = ? AND url = ?
-            ''', (
-                drop.get('price'),
-                drop.get('drop_date'),
-                datetime.now().isoformat(),
-                drop['name'],
-                drop['retailer'],
-                drop['url']
-            ))
-            conn.commit()
-        finally:
-            conn.close()
+        with self._db_lock:
+            cursor = self.conn.cursor()
+            
+            try:
+                cursor.execute('''
+                    INSERT OR REPLACE INTO drops 
+                    (product_name, retailer, url, price, drop_date, discovered_date, last_checked)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                ''', (
+                    drop['name'],
+                    drop['retailer'],
+                    drop['url'],
+                    drop.get('price'),
+                    drop.get('drop_date'),
+                    now,
+                    now
+                ))
+                self.conn.commit()
+            except sqlite3.IntegrityError:
+                # Update existing entry
+                cursor.execute('''
+                    UPDATE drops 
+                    SET price = ?, drop_date = ?, last_checked = ?
+                    WHERE product_name = ? AND retailer = ? AND url = ?
+                ''', (
+                    drop.get('price'),
+                    drop.get('drop_date'),
+                    now,
+                    drop['name'],
+                    drop['retailer'],
+                    drop['url']
+                ))
+                self.conn.commit()
     
-    def get_all_drops(self, status='upcoming') -> List[Dict]:
-        """Get all drops from database"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+    def save_drops_bulk(self, drops: List[Dict]):
+        """Save a batch of drops to the database in a single transaction"""
+        if not drops:
+            return
         
-        cursor.execute('''
-            SELECT id, product_name, retailer, url, price, drop_date, drop_time, 
-                   status, discovered_date, notified
-            FROM drops
-            WHERE status = ?
-            ORDER BY drop_date ASC, discovered_date DESC
-        ''', (status,))
-        
-        rows = cursor.fetchall()
-        conn.close()
+        now = datetime.now().isoformat()
         
-        drops = []
-        for row in rows:
-            drops.append({
-                'id': row[0],
-                'name': row[1],
-                'retailer': row[2],
-                'url': row[3],
-                'price': row[4],
-                'drop_date': row[5],
-                'drop_time': row[6],
-                'status': row[7],
-                'discovered_date': row[8],
-                'notified': row[9]
-            })
-        
-        return drops
+        with self._db_lock:
+            cursor = self.conn.cursor()
+            
+            try:
+                cursor.execute('BEGIN IMMEDIATE')
+                cursor.executemany('''
+                    INSERT OR REPLACE INTO drops 
+                    (product_name, retailer, url, price, drop_date, discovered_date, last_checked)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                ''', [
+                    (drop['name'], drop['retailer'], drop['url'], drop.get('price'), drop.get('drop_date'), now, now)
+                    for drop in drops
+                ])
+                self.conn.commit()
+            except Exception:
+                self.conn.rollback()
+                raise
+    
+    def get_all_drops(self, status='upcoming', limit: Optional[int] = None, offset: int = 0) -> List[Dict]:
+        """Get all drops from database, optionally one page at a time"""
+        with self._db_lock:
+            cursor = self.conn.cursor()
+            
+            cursor.execute('''
+                SELECT id, product_name AS name, retailer, url, price, drop_date, drop_time, 
+                       status, discovered_date, notified
+            ''' + _SQL_DROPS_PAGE, (status, -1 if limit is None else limit, offset))
+            
+            return [dict(row) for row in cursor]
+    
+    def get_all_drops_json(self, status='upcoming', limit: Optional[int] = None, offset: int = 0,
+                           conn: Optional[sqlite3.Connection] = None) -> Tuple[str, int]:
+        """Get drops as a JSON array, in get_all_drops order, and its length; reads on conn if given"""
+        # Each row is encoded by SQLite's json_object, so no per-row dicts are built in Python.
+        # The array itself is joined here: json_group_array does not promise to keep the
+        # subquery's ORDER BY, while a plain SELECT's rows come back in order
+        params = (status, -1 if limit is None else limit, offset)
+        if conn is not None:
+            rows = [row[0] for row in conn.execute(_SQL_DROPS_JSON, params)]
+        else:
+            with self._db_lock:
+                rows = [row[0] for row in self.conn.execute(_SQL_DROPS_JSON, params)]
+        
+        return '[' + ','.join(rows) + ']', len(rows)
     
     def check_for_alerts(self):
         """Check if any drops need alerts (7 days before drop)"""
-        drops = self.get_all_drops()
-        alerts = []
-        
-        for drop in drops:
-            if drop['drop_date'] and not drop['notified']:
-                try:
-                    # Parse drop date
-                    drop_date = datetime.fromisoformat(drop['drop_date'])
-                    days_until_drop = (drop_date - datetime.now()).days
-                    
-                    # Alert if drop is within 7 days
-                    if 0 <= days_until_drop <= 7:
-                        alerts.append(drop)
-                        self.mark_as_notified(drop['id'])
-                except:
-                    pass
+        # ISO dates sort lexically, so the "within 7 days" window is applied in SQL:
+        # 0 <= (drop_date - now).days <= 7 is the same as now <= drop_date < now + 8 days
+        now = datetime.now()
+        
+        with self._db_lock:
+            cursor = self.conn.cursor()
+            
+            cursor.execute('''
+                SELECT id, product_name AS name, retailer, url, price, drop_date, drop_time, 
+                       status, discovered_date, notified
+                FROM drops
+                WHERE status = 'upcoming' AND notified = 0
+                  AND drop_date >= ? AND drop_date < ?
+                ORDER BY drop_date ASC
+            ''', (now.isoformat(), (now + timedelta(days=8)).isoformat()))
+            
+            alerts = [dict(row) for row in cursor]
+        
+        self.mark_as_notified([alert['id'] for alert in alerts])
         
         return alerts
     
-    def mark_as_notified(self, drop_id: int):
-        """Mark a drop as notified"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+    def mark_as_notified(self, drop_ids: List[int]):
+        """Mark a batch of drops as notified in a single transaction"""
+        if not drop_ids:
+            return
         
-        cursor.execute('UPDATE drops SET notified = 1 WHERE id = ?', (drop_id,))
-        cursor.execute('''
-            INSERT INTO notifications (drop_id, notification_date, notification_type)
-            VALUES (?, ?, ?)
-        ''', (drop_id, datetime.now().isoformat(), '7-day-alert'))
+        now = datetime.now().isoformat()
+        placeholders = ','.join('?' * len(drop_ids))
         
-        conn.commit()
-        conn.close()
+        with self._db_lock:
+            cursor = self.conn.cursor()
+            
+            try:
+                cursor.execute(f'UPDATE drops SET notified = 1 WHERE id IN ({placeholders})', drop_ids)
+                cursor.executemany('''
+                    INSERT INTO notifications (drop_id, notification_date, notification_type)
+                    VALUES (?, ?, ?)
+                ''', [(drop_id, now, '7-day-alert') for drop_id in drop_ids])
+                self.conn.commit()
+            except Exception:
+                self.conn.rollback()
+                raise
     
     def send_email_notification(self, drops: List[Dict], email_to: str, email_from: str, smtp_config: Dict):
         """Send email notification about upcoming drops"""
@@ -382,40 +602,19 @@ class CardDropMonitor:
         msg['To'] = email_to
         
         # Create HTML email
-        html = f"""
-        <html>
-          <head></head>
-          <body>
-            <h2>Upcoming Card Drops - Next 7 Days!</h2>
-            <p>The following Pokemon/TCG products are releasing soon:</p>
-            <table border="1" cellpadding="10" style="border-collapse: collapse;">
-              <tr style="background-color: #f2f2f2;">
-                <th>Product</th>
-                <th>Retailer</th>
-                <th>Price</th>
-                <th>Drop Date</th>
-                <th>Link</th>
-              </tr>
-        """
-        
-        for drop in drops:
-            price_str = f"${drop['price']:.2f}" if drop['price'] else 'TBD'
-            html += f"""
-              <tr>
-                <td>{drop['name']}</td>
-                <td>{drop['retailer']}</td>
-                <td>{price_str}</td>
-                <td>{drop['drop_date'] or 'TBD'}</td>
-                <td><a href="{drop['url']}">View Product</a></td>
-              </tr>
-            """
-        
-        html += """
-            </table>
-            <p><strong>Remember:</strong> Set reminders to check these sites at the drop time!</p>
-          </body>
-        </html>
-        """
+        parts = [_EMAIL_HEAD]
+        parts.extend(
+            _EMAIL_ROW.format(
+                name=drop['name'],
+                retailer=drop['retailer'],
+                price=f"${drop['price']:.2f}" if drop['price'] else 'TBD',
+                drop_date=drop['drop_date'] or 'TBD',
+                url=drop['url']
+            )
+            for drop in drops
+        )
+        parts.append(_EMAIL_TAIL)
+        html = ''.join(parts)
         
         msg.attach(MIMEText(html, 'html'))
         
@@ -424,43 +623,57 @@ class CardDropMonitor:
                 server.starttls()
                 server.login(smtp_config['username'], smtp_config['password'])
                 server.send_message(msg)
-            print(f"Email notification sent for {len(drops)} drops")
-        except Exception as e:
-            print(f"Error sending email: {e}")
+            log.info("Email notification sent for %d drops", len(drops))
+        except Exception:
+            log.exception("Error sending email")
     
-    def run_scan(self):
-        """Run a complete scan of all retailers"""
-        print(f"Starting scan at {datetime.now().isoformat()}")
+    def create_session(self) -> aiohttp.ClientSession:
+        """Create an HTTP session for scanning; call it from inside the event loop"""
+        connector = aiohttp.TCPConnector(limit=20, limit_per_host=4, ttl_dns_cache=300)
+        return aiohttp.ClientSession(connector=connector, headers=self.headers)
+    
+    async def run_scan(self, session: Optional[aiohttp.ClientSession] = None):
+        """Run a complete scan of all retailers, reusing session when one is given"""
+        if session is None:
+            async with self.create_session() as session:
+                return await self.run_scan(session)
         
-        all_results = []
+        log.info("Starting scan")
         
-        print("Scanning Walmart...")
-        all_results.extend(self.search_walmart())
+        all_results = []
         
-        print("Scanning Target...")
-        all_results.extend(self.search_target())
+        # Bound in-flight requests so we don't trip retailer rate limits
+        semaphore = asyncio.Semaphore(8)
         
-        print("Scanning Best Buy...")
-        all_results.extend(self.search_bestbuy())
+        # Scan all retailers concurrently; total time is bounded by the slowest one
+        log.info("Scanning Walmart, Target, Best Buy and GameStop...")
+        retailer_results = await asyncio.gather(
+            self.search_walmart(session, semaphore),
+            self.search_target(session, semaphore),
+            self.search_bestbuy(session, semaphore),
+            self.search_gamestop(session, semaphore)
+        )
         
-        print("Scanning GameStop...")
-        all_results.extend(self.search_gamestop())
+        for results in retailer_results:
+            all_results.extend(results)
         
-        print(f"Found {len(all_results)} potential drops")
+        log.info("Found %d potential drops", len(all_results))
         
         # Save to database
-        for drop in all_results:
-            self.save_drop(drop)
+        self.save_drops_bulk(all_results)
         
         # Check for alerts
         alerts = self.check_for_alerts()
-        print(f"Generated {len(alerts)} alerts")
+        log.info("Generated %d alerts", len(alerts))
         
         return all_results, alerts
 
 
 def main():
     """Main function to run the monitor"""
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+    signal.signal(signal.SIGINT, lambda *_: _stop.set())
+    signal.signal(signal.SIGTERM, lambda *_: _stop.set())
     monitor = CardDropMonitor()
     
     # Configuration
@@ -477,9 +690,9 @@ def main():
         'scan_interval_hours': 6  # Scan every 6 hours
     }
     
-    while True:
+    while not _stop.is_set():
         try:
-            results, alerts = monitor.run_scan()
+            results, alerts = asyncio.run(monitor.run_scan())
             
             # Send notifications if enabled
             if config['email_enabled'] and alerts:
@@ -492,29 +705,29 @@ def main():
             
             # Display alerts to console
             if alerts:
-                print("\n" + "="*60)
-                print("UPCOMING DROPS (Next 7 Days):")
-                print("="*60)
+                log.info("UPCOMING DROPS (Next 7 Days):")
                 for alert in alerts:
-                    print(f"\n{alert['name']}")
-                    print(f"  Retailer: {alert['retailer']}")
-                    print(f"  Price: ${alert['price']:.2f}" if alert['price'] else "  Price: TBD")
-                    print(f"  Drop Date: {alert['drop_date'] or 'TBD'}")
-                    print(f"  URL: {alert['url']}")
-                print("="*60 + "\n")
+                    log.info(
+                        "%s | Retailer: %s | Price: %s | Drop Date: %s | URL: %s",
+                        alert['name'],
+                        alert['retailer'],
+                        f"${alert['price']:.2f}" if alert['price'] else 'TBD',
+                        alert['drop_date'] or 'TBD',
+                        alert['url']
+                    )
             
-            # Wait before next scan
+            # Wait before next scan; returns early if we're asked to stop
             wait_seconds = config['scan_interval_hours'] * 3600
-            print(f"Next scan in {config['scan_interval_hours']} hours...")
-            time.sleep(wait_seconds)
+            log.info("Next scan in %d hours...", config['scan_interval_hours'])
+            if _stop.wait(wait_seconds):
+                break
             
-        except KeyboardInterrupt:
-            print("\nMonitoring stopped by user")
-            break
-        except Exception as e:
-            print(f"Error during scan: {e}")
-            print("Retrying in 1 hour...")
-            time.sleep(3600)
+        except Exception:
+            log.exception("Error during scan, retrying in 1 hour")
+            if _stop.wait(3600):
+                break
+    
+    log.info("Monitoring stopped")
 
 
 if __name__ == '__main__':
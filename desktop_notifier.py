@@ -4,11 +4,18 @@ Desktop Notification System for Card Drops
 Sends native desktop notifications for upcoming drops
 """
 
+import logging
+import signal
 import sqlite3
 from datetime import datetime, timedelta
-import time
+import threading
 import platform
 
+log = logging.getLogger(__name__)
+
+# Set by SIGINT/SIGTERM to end the monitor loop without waiting out the interval
+_stop = threading.Event()
+
 # Try to import notification libraries based on OS
 system = platform.system()
 
@@ -17,7 +24,7 @@ if system == "Windows":
         from win10toast import ToastNotifier
         toaster = ToastNotifier()
     except ImportError:
-        print("Install win10toast: pip install win10toast")
+        log.warning("Install win10toast: pip install win10toast")
         toaster = None
 elif system == "Darwin":  # macOS
     import subprocess
@@ -26,13 +33,27 @@ elif system == "Linux":
         import notify2
         notify2.init("Card Drop Monitor")
     except ImportError:
-        print("Install notify2: pip install notify2")
+        log.warning("Install notify2: pip install notify2")
 
 class DesktopNotifier:
     def __init__(self, db_path='card_drops.db'):
         self.db_path = db_path
         self.system = platform.system()
+        self.conn = self._connect()
+        self._db_lock = threading.Lock()
         
+    def _connect(self):
+        """Open a database connection with WAL journaling and tuned pragmas"""
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute('PRAGMA wal_autocheckpoint=1000')
+        conn.execute('PRAGMA busy_timeout=5000')
+        conn.execute('PRAGMA temp_store=MEMORY')
+        conn.execute('PRAGMA mmap_size=268435456')
+        conn.execute('PRAGMA cache_size=-20000')
+        return conn
+    
     def send_notification(self, title, message, url=None):
         """Send a desktop notification based on OS"""
         try:
@@ -54,28 +75,30 @@ class DesktopNotifier:
                 notification.set_timeout(10000)  # 10 seconds
                 notification.show()
             else:
-                print(f"[NOTIFICATION] {title}: {message}")
-        except Exception as e:
-            print(f"Error sending notification: {e}")
-            print(f"[NOTIFICATION] {title}: {message}")
+                log.info("[NOTIFICATION] %s: %s", title, message)
+        except Exception:
+            log.exception("Error sending notification")
+            log.info("[NOTIFICATION] %s: %s", title, message)
     
     def check_upcoming_drops(self):
         """Check for drops happening soon and send notifications"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Get all upcoming drops
-        cursor.execute('''
-            SELECT id, product_name, retailer, url, drop_date, drop_time
-            FROM drops
-            WHERE status = 'upcoming'
-            ORDER BY drop_date ASC
-        ''')
+        now = datetime.now()
         
-        drops = cursor.fetchall()
-        conn.close()
+        with self._db_lock:
+            cursor = self.conn.cursor()
+            
+            # Only fetch upcoming drops inside the widest notification window
+            # (last hour through next 7 days); ISO dates compare lexically
+            cursor.execute('''
+                SELECT id, product_name, retailer, url, drop_date, drop_time
+                FROM drops
+                WHERE status = 'upcoming'
+                  AND drop_date > ? AND drop_date < ?
+                ORDER BY drop_date ASC
+            ''', ((now - timedelta(hours=1)).isoformat(), (now + timedelta(days=7)).isoformat()))
+            
+            drops = cursor.fetchall()
         
-        now = datetime.now()
         notifications_sent = []
         
         for drop in drops:
@@ -128,36 +151,39 @@ class DesktopNotifier:
                     )
                     notifications_sent.append(drop_id)
                     
-            except Exception as e:
-                print(f"Error processing drop {drop_id}: {e}")
+            except Exception:
+                log.exception("Error processing drop %s", drop_id)
         
         return notifications_sent
     
     def monitor_continuously(self, check_interval_minutes=15):
         """Continuously monitor and send notifications"""
-        print(f"Desktop notification monitor started")
-        print(f"Checking every {check_interval_minutes} minutes")
-        print(f"Operating System: {self.system}")
-        print("="*60)
+        log.info("Desktop notification monitor started")
+        log.info("Checking every %d minutes", check_interval_minutes)
+        log.info("Operating System: %s", self.system)
         
-        while True:
+        while not _stop.is_set():
             try:
                 notifications = self.check_upcoming_drops()
                 if notifications:
-                    print(f"Sent {len(notifications)} notifications at {datetime.now()}")
+                    log.info("Sent %d notifications", len(notifications))
                 
-                # Wait before next check
-                time.sleep(check_interval_minutes * 60)
+                # Wait before next check; returns early if we're asked to stop
+                if _stop.wait(check_interval_minutes * 60):
+                    break
                 
-            except KeyboardInterrupt:
-                print("\nNotification monitor stopped by user")
-                break
-            except Exception as e:
-                print(f"Error in monitor loop: {e}")
-                time.sleep(60)  # Wait 1 minute on error
+            except Exception:
+                log.exception("Error in monitor loop")
+                if _stop.wait(60):  # Wait 1 minute on error
+                    break
+        
+        log.info("Notification monitor stopped")
 
 def main():
     """Main function"""
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+    signal.signal(signal.SIGINT, lambda *_: _stop.set())
+    signal.signal(signal.SIGTERM, lambda *_: _stop.set())
     notifier = DesktopNotifier()
     
     # Test notification
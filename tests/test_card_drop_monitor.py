@@ -0,0 +1,31 @@
+import json
+import sqlite3
+
+from card_drop_monitor import CardDropMonitor
+
+
+def test_drops_json_matches_get_all_drops(tmp_path):
+    monitor = CardDropMonitor(str(tmp_path / 'drops.db'))
+    monitor.save_drops_bulk([
+        {'name': f'Pokemon Set {i}', 'retailer': 'Target', 'url': f'https://example.com/{i}',
+         'price': 4.99 + i, 'drop_date': f'2030-01-{(i * 7) % 28 + 1:02d}'}
+        for i in range(12)
+    ])
+    
+    for limit, offset in [(None, 0), (5, 0), (5, 5), (5, 10)]:
+        drops_json, count = monitor.get_all_drops_json(limit=limit, offset=offset)
+        expected = monitor.get_all_drops(limit=limit, offset=offset)
+        assert json.loads(drops_json) == expected
+        assert count == len(expected)
+
+
+def test_drops_json_on_read_only_connection(tmp_path):
+    db_path = tmp_path / 'drops.db'
+    monitor = CardDropMonitor(str(db_path))
+    monitor.save_drops_bulk([
+        {'name': 'Pokemon Booster Box', 'retailer': 'GameStop', 'url': 'https://example.com/box',
+         'price': 143.99, 'drop_date': '2030-02-01'}
+    ])
+    conn = sqlite3.connect(db_path.resolve().as_uri() + '?mode=ro', uri=True)
+    
+    assert monitor.get_all_drops_json(conn=conn) == monitor.get_all_drops_json()
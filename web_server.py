@@ -4,50 +4,254 @@ Flask Web Server for Card Drop Monitor
 Serves the dashboard and provides API endpoints
 """
 
-from flask import Flask, jsonify, send_file, request
+from flask import Flask, Response, abort, jsonify, request
+from flask_compress import Compress
 from flask_cors import CORS
+from flask_orjson import OrjsonProvider
+from cachetools import TTLCache, cached
+from cachetools.keys import hashkey
+import asyncio
+import atexit
+import hashlib
+import logging
+import os
+import pathlib
+import queue
 import sqlite3
 import json
 from datetime import datetime
+from collections import namedtuple
+from contextlib import contextmanager
+from functools import partial
 import threading
 import time
 from card_drop_monitor import CardDropMonitor
 
+log = logging.getLogger(__name__)
+
 app = Flask(__name__)
+# Serialize API responses with orjson instead of the stdlib encoder
+app.json = OrjsonProvider(app)
 CORS(app)
 
 # Initialize monitor
 monitor = CardDropMonitor()
 
-def background_scanner():
-    """Background thread to scan retailers periodically"""
+# The dashboard is static: read it once and let browsers revalidate against its ETag
+try:
+    with open(os.path.join(app.root_path, 'dashboard.html'), 'rb') as f:
+        DASHBOARD_BYTES = f.read()
+    DASHBOARD_ETAG = hashlib.md5(DASHBOARD_BYTES).hexdigest()
+except FileNotFoundError:
+    DASHBOARD_BYTES = DASHBOARD_ETAG = None
+
+# Read-only connections for request handlers, pooled so they outlive the
+# per-request threads of the development server; only the scanner writes,
+# through the monitor's own connection
+_POOL_SIZE = 8
+_pool = queue.LifoQueue(maxsize=_POOL_SIZE)
+
+def _open_conn():
+    # The database is already in WAL mode (set by the monitor), so readers never block the scanner
+    uri = pathlib.Path(monitor.db_path).resolve().as_uri() + '?mode=ro'
+    conn = sqlite3.connect(uri, uri=True, check_same_thread=False, isolation_level=None)
+    conn.execute('PRAGMA busy_timeout=5000')
+    conn.execute('PRAGMA cache_size=-20000')
+    return conn
+
+@contextmanager
+def get_conn():
+    """Borrow a pooled read-only connection for the duration of the block"""
+    try:
+        conn = _pool.get_nowait()
+    except queue.Empty:
+        conn = _open_conn()
+    try:
+        yield conn
+    finally:
+        # Kept for the next request unless enough connections are already idle
+        try:
+            _pool.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+Drop = namedtuple('Drop', 'id name retailer url price drop_date drop_time status discovered_date notified')
+
+def drop_factory(cursor, row):
+    """Row factory building a Drop straight from the fetched tuple"""
+    return Drop._make(row)
+
+# Identical SQL text lets sqlite3's statement cache reuse the prepared statement per connection
+_SQL_GET_DROP = '''
+    SELECT id, product_name AS name, retailer, url, price, drop_date, drop_time,
+           status, discovered_date, notified
+    FROM drops
+    WHERE id = ?
+'''
+
+# Read-only payloads only change when a scan runs, so polls within the TTL are served from memory
+_cache = TTLCache(maxsize=64, ttl=60)
+_cache_lock = threading.Lock()
+
+def clear_cache():
+    """Drop cached payloads after the underlying data changes"""
+    with _cache_lock:
+        _cache.clear()
+
+# gzip/brotli for JSON responses. Compressed per response: flask-compress's own cache
+# is keyed by path alone and never expires under polling, so it would serve stale bodies
+app.config['COMPRESS_MIMETYPES'] = ['application/json']
+app.config['COMPRESS_ALGORITHM'] = ['br', 'gzip']
+Compress(app)
+
+@cached(_cache, key=partial(hashkey, 'drops'), lock=_cache_lock)
+def _drops_body(status, limit, offset):
+    # Cached already serialized so repeated polls skip JSON encoding entirely. Read on a
+    # pooled read-only connection so a cache miss never queues behind the scanner's writes
+    with get_conn() as conn:
+        drops_json, count = monitor.get_all_drops_json(status, limit, offset, conn)
+    return b'{"success":true,"drops":%s,"count":%d}' % (drops_json.encode(), count)
+
+@cached(_cache, key=partial(hashkey, 'stats'), lock=_cache_lock)
+def _stats_payload():
+    # Counts are aggregated in SQLite; only one row per retailer comes back, so they
+    # are read in full before responding and a database error still yields a 500
+    with get_conn() as conn:
+        by_retailer = dict(conn.execute('''
+            SELECT retailer, COUNT(*)
+            FROM drops
+            WHERE status = 'upcoming'
+            GROUP BY retailer
+        '''))
+    
+    return {
+        'success': True,
+        'stats': {
+            'total_drops': sum(by_retailer.values()),
+            'by_retailer': by_retailer,
+            'last_scan': datetime.now().isoformat()
+        }
+    }
+
+# check_for_alerts marks what it returns as notified, so concurrent misses must not
+# both run it: the second would get [] and could overwrite the real alerts in the cache
+_alerts_lock = threading.Lock()
+
+@cached(_cache, key=partial(hashkey, 'alerts'), lock=_cache_lock)
+def _compute_alerts_payload():
+    alerts = monitor.check_for_alerts()
+    return {
+        'success': True,
+        'alerts': alerts,
+        'count': len(alerts)
+    }
+
+def _alerts_payload():
+    with _alerts_lock:
+        return _compute_alerts_payload()
+
+SCAN_INTERVAL = 6 * 3600
+
+# Set after a manual scan so the background scanner restarts its interval instead of rescanning
+_scan_event = asyncio.Event()
+_last_scan_lock = threading.Lock()
+_last_scan_ts = 0.0
+_last_scan_result = None
+
+# One long-lived event loop hosts every scan, so scans no longer spin up a loop each time
+_scan_loop = None
+_scan_loop_lock = threading.Lock()
+
+def get_scan_loop():
+    """Get the scan event loop, starting its thread on first use"""
+    global _scan_loop
+    with _scan_loop_lock:
+        if _scan_loop is None:
+            _scan_loop = asyncio.new_event_loop()
+            threading.Thread(target=_scan_loop.run_forever, daemon=True).start()
+        return _scan_loop
+
+# HTTP session kept open on the scan loop so DNS lookups and connections carry over between scans
+_scan_session = None
+
+async def _scan():
+    """Run a scan, refresh cached payloads and remember the result"""
+    global _last_scan_ts, _last_scan_result, _scan_session
+    if _scan_session is None or _scan_session.closed:
+        _scan_session = monitor.create_session()
+    results, alerts = await monitor.run_scan(_scan_session)
+    clear_cache()
+    with _last_scan_lock:
+        _last_scan_ts = time.time()
+        _last_scan_result = (results, alerts)
+    return results, alerts
+
+@atexit.register
+def _close_scan_session():
+    if _scan_session is not None and not _scan_session.closed:
+        asyncio.run_coroutine_threadsafe(_scan_session.close(), _scan_loop).result(timeout=5)
+
+# The in-flight scan, shared so concurrent triggers wait on one scan instead of starting their own
+_scan_lock = threading.Lock()
+_scan_future = None
+
+def start_scan():
+    """Start a scan on the scan loop, or join the one already running"""
+    global _scan_future
+    with _scan_lock:
+        if _scan_future is None or _scan_future.done():
+            _scan_future = asyncio.run_coroutine_threadsafe(_scan(), get_scan_loop())
+        return _scan_future
+
+def run_scan():
+    """Run a scan on the scan loop and wait for its result"""
+    return start_scan().result()
+
+async def background_scanner():
+    """Scan retailers periodically on the scan loop"""
+    retry_delay = 60
     while True:
         try:
-            print("Running background scan...")
-            results, alerts = monitor.run_scan()
-            print(f"Scan complete. Found {len(results)} drops, {len(alerts)} alerts")
-        except Exception as e:
-            print(f"Error in background scan: {e}")
+            log.info("Running background scan")
+            results, alerts = await asyncio.wrap_future(start_scan())
+            log.info("Scan complete. Found %d drops, %d alerts", len(results), len(alerts))
+            next_delay = SCAN_INTERVAL
+            retry_delay = 60
+        except Exception:
+            log.exception("Error in background scan")
+            # Back off exponentially on repeated failures
+            next_delay = retry_delay
+            retry_delay = min(retry_delay * 2, SCAN_INTERVAL)
         
-        # Wait 6 hours before next scan
-        time.sleep(6 * 3600)
+        # Wait for the next scan; a manual scan in the meantime restarts the full interval
+        while True:
+            try:
+                await asyncio.wait_for(_scan_event.wait(), timeout=next_delay)
+            except asyncio.TimeoutError:
+                break
+            _scan_event.clear()
+            next_delay = SCAN_INTERVAL
 
 @app.route('/')
 def index():
     """Serve the dashboard"""
-    return send_file('dashboard.html')
+    if DASHBOARD_BYTES is None:
+        abort(404)
+    
+    response = Response(DASHBOARD_BYTES, mimetype='text/html')
+    response.set_etag(DASHBOARD_ETAG)
+    response.headers['Cache-Control'] = 'public, max-age=300'
+    # Answers with an empty 304 when the browser's If-None-Match matches
+    return response.make_conditional(request)
 
 @app.route('/api/drops', methods=['GET'])
 def get_drops():
     """Get all drops from database"""
     try:
         status = request.args.get('status', 'upcoming')
-        drops = monitor.get_all_drops(status)
-        return jsonify({
-            'success': True,
-            'drops': drops,
-            'count': len(drops)
-        })
+        limit = request.args.get('limit', type=int)
+        offset = request.args.get('offset', 0, type=int)
+        return Response(_drops_body(status, limit, offset), mimetype='application/json')
     except Exception as e:
         return jsonify({
             'success': False,
@@ -58,35 +262,15 @@ def get_drops():
 def get_drop(drop_id):
     """Get a specific drop by ID"""
     try:
-        conn = sqlite3.connect(monitor.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT id, product_name, retailer, url, price, drop_date, drop_time,
-                   status, discovered_date, notified
-            FROM drops
-            WHERE id = ?
-        ''', (drop_id,))
-        
-        row = cursor.fetchone()
-        conn.close()
+        with get_conn() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = drop_factory
+            row = cursor.execute(_SQL_GET_DROP, (drop_id,)).fetchone()
         
         if row:
-            drop = {
-                'id': row[0],
-                'name': row[1],
-                'retailer': row[2],
-                'url': row[3],
-                'price': row[4],
-                'drop_date': row[5],
-                'drop_time': row[6],
-                'status': row[7],
-                'discovered_date': row[8],
-                'notified': row[9]
-            }
             return jsonify({
                 'success': True,
-                'drop': drop
+                'drop': row._asdict()
             })
         else:
             return jsonify({
@@ -104,12 +288,21 @@ def get_drop(drop_id):
 def trigger_scan():
     """Manually trigger a scan"""
     try:
-        results, alerts = monitor.run_scan()
+        # A scan that finished within the last minute is reused rather than repeated
+        with _last_scan_lock:
+            recent = _last_scan_result if time.time() - _last_scan_ts < 60 else None
+        
+        if recent:
+            results, alerts = recent
+        else:
+            results, alerts = run_scan()
+            get_scan_loop().call_soon_threadsafe(_scan_event.set)
+        
         return jsonify({
             'success': True,
             'results_count': len(results),
             'alerts_count': len(alerts),
-            'timestamp': datetime.now().isoformat()
+            'timestamp': datetime.fromtimestamp(_last_scan_ts).isoformat()
         })
     except Exception as e:
         return jsonify({
@@ -121,24 +314,7 @@ def trigger_scan():
 def get_stats():
     """Get statistics about drops"""
     try:
-        drops = monitor.get_all_drops()
-        
-        # Calculate stats
-        total = len(drops)
-        by_retailer = {}
-        
-        for drop in drops:
-            retailer = drop['retailer']
-            by_retailer[retailer] = by_retailer.get(retailer, 0) + 1
-        
-        return jsonify({
-            'success': True,
-            'stats': {
-                'total_drops': total,
-                'by_retailer': by_retailer,
-                'last_scan': datetime.now().isoformat()
-            }
-        })
+        return jsonify(_stats_payload())
     except Exception as e:
         return jsonify({
             'success': False,
@@ -149,12 +325,7 @@ def get_stats():
 def get_alerts():
     """Get current alerts (drops within 7 days)"""
     try:
-        alerts = monitor.check_for_alerts()
-        return jsonify({
-            'success': True,
-            'alerts': alerts,
-            'count': len(alerts)
-        })
+        return jsonify(_alerts_payload())
     except Exception as e:
         return jsonify({
             'success': False,
@@ -162,9 +333,10 @@ def get_alerts():
         }), 500
 
 if __name__ == '__main__':
-    # Start background scanner thread
-    scanner_thread = threading.Thread(target=background_scanner, daemon=True)
-    scanner_thread.start()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+    
+    # Start the background scanner on the scan loop
+    asyncio.run_coroutine_threadsafe(background_scanner(), get_scan_loop())
     
     print("="*60)
     print("Card Drop Monitor Server Starting...")
@@ -173,5 +345,5 @@ if __name__ == '__main__':
     print("API: http://localhost:5000/api/drops")
     print("="*60)
     
-    # Run Flask app
-    app.run(host='0.0.0.0', port=5000, debug=True, use_reloader=False)
+    # Run Flask app; the interactive debugger is opt-in with FLASK_DEBUG=1
+    app.run(host='0.0.0.0', port=5000, debug=os.getenv('FLASK_DEBUG') == '1', use_reloader=False, threaded=True)
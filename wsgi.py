@@ -0,0 +1,11 @@
+#!/usr/bin/env python3
+"""
+WSGI entry point for the Card Drop Monitor API
+Used by uWSGI in production; see deploy/uwsgi.ini
+"""
+
+from web_server import app
+
+# The background scanner is not started here: every worker imports this
+# module, so scanning runs as a single separate process instead
+application = app